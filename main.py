@@ -1,27 +1,39 @@
 # lyrics_webapp.py
-# deps:
-#   pip install flask spotipy requests pypinyin argostranslate opencc-python-reimplemented
+# deps (python 3.10+):
+#   pip install flask waitress spotipy requests pypinyin argostranslate opencc-python-reimplemented
+# argos settings (env var or argos' settings.json, env wins):
+#   ARGOS_COMPUTE_TYPE  CTranslate2 compute type; int8 here if neither sets it ("default" for fp32)
+#   ARGOS_DEVICE_TYPE   "cpu" (argos default) or "cuda"
 
+import os
 import re
+import json
 import time
+import sqlite3
+import hashlib
 import threading
+import functools
+from html import escape as html_escape
 import requests
+from requests.adapters import HTTPAdapter
 from dataclasses import dataclass
 from typing import List, Optional
-from flask import Flask, jsonify, Response
+from concurrent.futures import Future, ThreadPoolExecutor
+from flask import Flask, Response
+from waitress import serve
 import spotipy
 from spotipy.oauth2 import SpotifyOAuth
 from pypinyin import lazy_pinyin, Style
 
-import logging
-log = logging.getLogger('werkzeug')
-log.setLevel(logging.ERROR)
 
 # NEW: offline CN->EN translation + (optional) trad->simp normalization
 import argostranslate.translate as ar_translate
+import argostranslate.settings as ar_settings
+# int8 unless the user picked a compute type through the env or settings.json
+if ar_settings.get_setting("ARGOS_COMPUTE_TYPE") is None:
+    ar_settings.compute_type = "int8"
 from opencc import OpenCC
 from dotenv import load_dotenv
-import os
 
 load_dotenv()
 # ───────── CONFIG ─────────
@@ -31,20 +43,31 @@ CLIENT_ID = os.getenv("CLIENT_ID")
 CLIENT_SECRET = os.getenv("CLIENT_SECRET")
 
 POLL_SEC = 2.0
+STREAM_TICK_SEC = 1.0
+WSGI_THREADS = 8
+MAX_STREAMS = WSGI_THREADS - 2  # each open tab pins a thread; keep 2 free for / and /api/state
+STREAM_RETRY_MS = 5000
 LRCLIB_TIMEOUT = 10
 ADD_TRANSLATION = True  
+# pinyin + translation cache, survives restarts; next to this file, not in the cwd
+CACHE_DB = os.path.join(os.path.dirname(os.path.abspath(__file__)), "lyrics_cache.db")
 # ──────────────────────────
 
 app = Flask(__name__)
 
-@dataclass
+@dataclass(slots=True)
 class LrcLine:
     t: float
     text: str
     pinyin: str = ""
     trans: str = ""
+    text_html: str = ""  # escaped once here so the page can inject it as-is
+
+    def __post_init__(self):
+        if not self.text_html:
+            self.text_html = html_escape(self.text)
 
-@dataclass
+@dataclass(slots=True)
 class TrackState:
     track_id: Optional[str] = None
     title: str = ""
@@ -55,6 +78,8 @@ class TrackState:
     lrc_lines: List[LrcLine] = None
     plain_lyrics: str = ""
     last_error: str = ""
+    _enrich_future: Optional[Future] = None  # pending pinyin/translation job for track_id
+    _lrc_json: str = "[]"                    # lrc_lines pre-serialized for the web api
 
 state = TrackState(lrc_lines=[])
 
@@ -82,50 +107,68 @@ def ensure_sp():
 # ───────── lyrics helpers ─────────
 LRC_TIME = re.compile(r"\[(\d{1,2}):(\d{2})(?:\.(\d{1,2}))?\]")
 
+_NT_SUFFIX = re.compile(r"\s*-\s*(remaster(ed)?\s*\d{2,4}|single version|album version|radio edit|clean|explicit)\b.*", re.I)
+_NT_FEAT = re.compile(r"\s*\(feat\..*?\)", re.I)
+_NT_VERSION = re.compile(r"\s*\[.*?version.*?\]", re.I)
+
 def normalize_title(title: str) -> str:
     t = title
-    t = re.sub(r"\s*-\s*(remaster(ed)?\s*\d{2,4}|single version|album version|radio edit|clean|explicit)\b.*", "", t, flags=re.I)
-    t = re.sub(r"\s*\(feat\..*?\)", "", t, flags=re.I)
-    t = re.sub(r"\s*\[.*?version.*?\]", "", t, flags=re.I)
+    t = _NT_SUFFIX.sub("", t)
+    t = _NT_FEAT.sub("", t)
+    t = _NT_VERSION.sub("", t)
     return t.strip()
 
 def primary_artist(artists_csv: str) -> str:
     return artists_csv.split(",")[0].strip()
 
+# pooled keep-alive connections to lrclib; fallback queries run concurrently
+SESSION = requests.Session()
+SESSION.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=8))
+_lrclib_pool = ThreadPoolExecutor(max_workers=3)
+
 def fetch_lrclib(artist: str, title: str, duration_sec: Optional[int]):
     base = "https://lrclib.net/api"
     params = {"artist_name": artist, "track_name": title}
     if duration_sec:
         params["duration"] = duration_sec
-    r = requests.get(f"{base}/get", params=params, timeout=LRCLIB_TIMEOUT)
+    r = SESSION.get(f"{base}/get", params=params, timeout=LRCLIB_TIMEOUT)
     if r.status_code == 404:
-        r = requests.get(f"{base}/search", params={"track_name": title, "artist_name": artist}, timeout=LRCLIB_TIMEOUT)
+        r = SESSION.get(f"{base}/search", params={"track_name": title, "artist_name": artist}, timeout=LRCLIB_TIMEOUT)
         if r.status_code != 200 or not r.json():
             return None
         best = r.json()[0]
-        r = requests.get(f"{base}/get", params={"id": best["id"]}, timeout=LRCLIB_TIMEOUT)
+        r = SESSION.get(f"{base}/get", params={"id": best["id"]}, timeout=LRCLIB_TIMEOUT)
     if r.status_code != 200:
         return None
     return r.json()
 
+_CJK_RE = re.compile(r"[\u4e00-\u9fff]")
+
 def is_cjk(s: str) -> bool:
-    return any('\u4e00' <= ch <= '\u9fff' for ch in s)
+    return bool(_CJK_RE.search(s))
 
 # Optional Traditional -> Simplified (improves pinyin/MT consistency for zh-TW lyrics)
 _opencc = OpenCC("t2s")
 
+@functools.lru_cache(maxsize=4096)
+def _t2s(s: str) -> str:
+    # to_pinyin and batch_translate both convert the same lines
+    return _opencc.convert(s)
+
+@functools.lru_cache(maxsize=8192)  # choruses repeat the same lines
 def to_pinyin(line: str) -> str:
     if not line or not is_cjk(line):
         return ""
     # convert to simplified for more consistent pinyin
-    simp = _opencc.convert(line)
+    simp = _t2s(line)
     py = lazy_pinyin(simp, style=Style.TONE, neutral_tone_with_five=True)
     return " ".join(tok for tok in py if tok.strip())
 
-
+@functools.lru_cache(maxsize=1)
 def get_argos_zh_en():
     """
     Return Argos translator zh->en if the model is installed, else None.
+    Memoized process-wide (restart after installing the model).
     Install once:
       python -c "import argostranslate.package as p; \
                  pkg=[x for x in p.get_available_packages() if x.from_code=='zh' and x.to_code=='en'][0]; \
@@ -136,9 +179,42 @@ def get_argos_zh_en():
     except Exception:
         return None
 
+_ct2_failed = False  # model load failed once; don't retry it for every song
+
+def _ct2_backend(translator):
+    """
+    Dig the ctranslate2.Translator, tokenizer and target prefix out of an Argos
+    translation so a whole song can go through one translate_batch call. None if
+    the installed argostranslate doesn't expose them or the model can't be loaded
+    (then we fall back to per-line translate).
+    """
+    global _ct2_failed
+    if _ct2_failed:
+        return None
+    inner = getattr(translator, "underlying", translator)  # unwrap CachedTranslation
+    pkg = getattr(inner, "pkg", None)
+    tokenizer = getattr(pkg, "tokenizer", None)
+    if pkg is None or tokenizer is None:
+        return None
+    try:
+        if getattr(inner, "translator", None) is None:
+            import ctranslate2
+            # same construction as argos' own PackageTranslation
+            inner.translator = ctranslate2.Translator(
+                str(pkg.package_path / "model"),
+                device=ar_settings.device,
+                inter_threads=ar_settings.inter_threads,
+                intra_threads=ar_settings.intra_threads,
+                compute_type=ar_settings.compute_type)
+    except Exception as e:
+        _ct2_failed = True
+        print(f"[argos] batch backend unavailable, translating per line: {e}")
+        return None
+    return inner.translator, tokenizer, getattr(pkg, "target_prefix", "") or ""
+
 def batch_translate(lines: list[str]) -> dict[str, str]:
-    """Offline translation using Argos; returns {original_line: english}."""
-    uniq = [s for s in dict.fromkeys(lines) if is_cjk(s)]
+    """Offline translation using Argos; returns {original_line: english}. Expects CJK lines."""
+    uniq = list(dict.fromkeys(lines))
     if not uniq:
         return {}
     translator = get_argos_zh_en()
@@ -148,10 +224,30 @@ def batch_translate(lines: list[str]) -> dict[str, str]:
         for s in uniq:
             out[s] = ""
         return out
-    for s in uniq:
+    # normalize to simplified for slightly better MT
+    simp_list = [_t2s(s) for s in uniq]
+    try:
+        backend = _ct2_backend(translator)
+    except Exception:
+        backend = None
+    if backend is not None:
+        try:
+            model, tokenizer, prefix = backend
+            # greedy decoding: lyric glosses don't need beam-4 quality
+            results = model.translate_batch(
+                [tokenizer.encode(simp) for simp in simp_list],
+                target_prefix=[[prefix]] * len(simp_list) if prefix else None,
+                beam_size=1, max_batch_size=32, replace_unknowns=True)
+            for s, res in zip(uniq, results):
+                text = tokenizer.decode(res.hypotheses[0]).strip()
+                if prefix and text.startswith(prefix):
+                    text = text[len(prefix):].strip()
+                out[s] = text
+            return out
+        except Exception:
+            out.clear()
+    for s, simp in zip(uniq, simp_list):
         try:
-            # normalize to simplified for slightly better MT
-            simp = _opencc.convert(s)
             out[s] = translator.translate(simp) or ""
         except Exception:
             out[s] = ""
@@ -161,34 +257,158 @@ def parse_lrc(text: str) -> List[LrcLine]:
     if not text:
         return []
     lines: List[LrcLine] = []
-    for raw in text.splitlines():
-        times = list(LRC_TIME.finditer(raw))
-        lyric = LRC_TIME.sub("", raw).strip()
-        for m in times:
-            mm, ss = int(m.group(1) or 0), int(m.group(2) or 0)
-            frac = m.group(3) or ""
-            cs = int(frac) if frac else 0
-            denom = 10 if len(frac) == 1 else 100
-            t = mm * 60 + ss + (cs / denom if denom else 0)
-            if lyric:
-                lines.append(LrcLine(t=t, text=lyric))
+    times: List[float] = []  # stacked tags, e.g. [00:29][00:44]chorus
+    matches = list(LRC_TIME.finditer(text))
+    for i, m in enumerate(matches):
+        mm, ss = int(m.group(1) or 0), int(m.group(2) or 0)
+        frac = m.group(3) or ""
+        cs = int(frac) if frac else 0
+        denom = 10 if len(frac) == 1 else 100
+        times.append(mm * 60 + ss + (cs / denom if denom else 0))
+
+        # lyric runs from this tag to the next tag or end of line
+        eol = text.find("\n", m.end())
+        if eol < 0:
+            eol = len(text)
+        end = min(eol, matches[i + 1].start()) if i + 1 < len(matches) else eol
+        lyric = text[m.end():end].strip()
+        if lyric:
+            lines.extend(LrcLine(t=t, text=lyric) for t in times)
+        if lyric or end == eol:
+            times = []
     lines.sort(key=lambda x: x.t)
     return lines
 
+class LyricsCache:
+    """
+    sqlite cache of {sha1(line): (pinyin, trans)} so replayed songs skip pinyin + MT.
+    Purely an optimisation: if the db can't be opened, read or written, lookups
+    miss and writes are dropped.
+    """
+
+    def __init__(self, path: str):
+        self.lock = threading.Lock()
+        try:
+            self.conn = sqlite3.connect(path, check_same_thread=False)
+            with self.lock, self.conn:
+                self.conn.execute(
+                    "CREATE TABLE IF NOT EXISTS cache(hash TEXT PRIMARY KEY, pinyin TEXT, trans TEXT)")
+        except sqlite3.Error as e:
+            print(f"[cache] disabled, can't open {path}: {e}")
+            self.conn = None
+
+    @staticmethod
+    def key(line: str) -> str:
+        return hashlib.sha1(line.encode("utf-8")).hexdigest()
+
+    def get_many(self, lines: list[str]) -> dict[str, tuple[str, str]]:
+        """Bulk lookup; returns {line: (pinyin, trans)} for hits only."""
+        if self.conn is None:
+            return {}
+        by_hash = {self.key(s): s for s in lines}
+        out = {}
+        hashes = list(by_hash)
+        try:
+            with self.lock:
+                # stay under sqlite's bound-parameter limit on older builds
+                for i in range(0, len(hashes), 500):
+                    chunk = hashes[i:i + 500]
+                    rows = self.conn.execute(
+                        f"SELECT hash, pinyin, trans FROM cache WHERE hash IN ({','.join('?' * len(chunk))})",
+                        chunk)
+                    for h, py, tr in rows:
+                        out[by_hash[h]] = (py, tr)
+        except sqlite3.Error as e:
+            print(f"[cache] read failed: {e}")
+            return {}
+        return out
+
+    def put_many(self, items: dict[str, tuple[str, str]]):
+        if self.conn is None or not items:
+            return
+        try:
+            with self.lock, self.conn:
+                self.conn.executemany(
+                    "INSERT OR REPLACE INTO cache(hash, pinyin, trans) VALUES (?, ?, ?)",
+                    [(self.key(s), py, tr) for s, (py, tr) in items.items()])
+        except sqlite3.Error as e:
+            print(f"[cache] write failed: {e}")
+
+_cache = LyricsCache(CACHE_DB)
+
 def enrich_with_pinyin_and_trans(lines: List[LrcLine]) -> List[LrcLine]:
+    """
+    Return a new list of lines with pinyin/trans filled in; `lines` is left as-is,
+    since it's already published raw while this runs in the background.
+    Non-CJK songs have nothing to add and get `lines` itself back.
+    """
+    # nothing to do for non-Chinese songs; one regex scan over the whole song
+    if not is_cjk("\n".join(ln.text for ln in lines)):
+        return lines
+
+    uniq = list(dict.fromkeys(ln.text for ln in lines))
+    cached = _cache.get_many(uniq)
+    has_cjk = {s: is_cjk(s) for s in uniq}
+
     # Always compute pinyin
-    for ln in lines:
-        ln.pinyin = to_pinyin(ln.text) or ""
+    pinyin = {}
+    for s in uniq:
+        if s in cached:
+            pinyin[s] = cached[s][0]
+        else:
+            pinyin[s] = (to_pinyin(s) or "") if has_cjk[s] else ""
 
-    # Offline Argos translation per unique line
+    # Offline Argos translation per unique line. An empty cached translation on a
+    # CJK line means translation was off or failed last time, so retry it.
+    trans = {s: tr for s, (_, tr) in cached.items()}
     if ADD_TRANSLATION:
-        mapping = batch_translate([ln.text for ln in lines])
-        for ln in lines:
-            ln.trans = mapping.get(ln.text, "") or ""
-    else:
-        for ln in lines:
-            ln.trans = ""
-    return lines
+        todo = [s for s in uniq if has_cjk[s] and not trans.get(s)]
+        trans.update(batch_translate(todo))
+
+    # cache pinyin even when translation is off/failed; rows only get rewritten
+    # when a translation shows up for them
+    _cache.put_many({s: (pinyin[s], trans.get(s, "") or "") for s in uniq
+                     if s not in cached or (trans.get(s) or "") != cached[s][1]})
+
+    return [LrcLine(t=ln.t, text=ln.text, text_html=ln.text_html, pinyin=pinyin[ln.text],
+                    trans=(trans.get(ln.text, "") or "") if ADD_TRANSLATION else "")
+            for ln in lines]
+
+# one worker: enrichment is CPU-bound and only the latest track matters
+_enrich_pool = ThreadPoolExecutor(max_workers=1)
+_enrich_lock = threading.Lock()
+
+def set_lrc_lines(lines: List[LrcLine]):
+    """Replace the lyrics and re-serialize them once, instead of on every request."""
+    # pinyin/trans are display-only, so they ship HTML-escaped like text_html
+    state._lrc_json = json.dumps([{"t": ln.t, "text": ln.text, "text_html": ln.text_html,
+                                   "pinyin": html_escape(ln.pinyin), "trans": html_escape(ln.trans)}
+                                  for ln in lines])
+    state.lrc_lines = lines
+
+def publish_enrichment():
+    """Swap in enriched lyrics once the background job for the current track is done."""
+    with _enrich_lock:
+        fut = state._enrich_future
+        if fut is None or not fut.done():
+            return
+        state._enrich_future = None
+        try:
+            enriched = fut.result()
+        except Exception as e:
+            # the raw lines published by refresh_state stay up
+            state.last_error = f"enrich error: {e}"
+            return
+        if enriched is not state.lrc_lines:  # non-CJK songs come back unchanged
+            set_lrc_lines(enriched)
+
+        if ADD_TRANSLATION and all((ln.trans == "" for ln in state.lrc_lines)) \
+           and any(is_cjk(ln.text) for ln in state.lrc_lines):
+            state.last_error = (state.last_error or "") + \
+                " | Argos zh→en model not installed. See code comment for install snippet."
+
+    sample = state.lrc_lines[0].pinyin if state.lrc_lines else "(none)"
+    print(f"[lyrics] lines={len(state.lrc_lines)}; sample pinyin: {sample}")
 
 def refresh_state():
     global state
@@ -225,9 +445,16 @@ def refresh_state():
         artist_q = primary_artist(state.artists)
         dur_sec = int((state.duration_ms or 0) / 1000)
 
-        data = (fetch_lrclib(artist_q, title_q, dur_sec)
-                or fetch_lrclib(artist_q, title_q, None)
-                or fetch_lrclib(state.artists, title_q, dur_sec))
+        queries = [(artist_q, title_q, dur_sec),
+                   (artist_q, title_q, None),
+                   (state.artists, title_q, dur_sec)]
+        # fire all fallbacks at once, but keep their priority order
+        futures = [_lrclib_pool.submit(fetch_lrclib, *q) for q in queries]
+        data = None
+        for f in futures:
+            data = f.result()
+            if data:
+                break
 
         if data:
             state.plain_lyrics = data.get("plainLyrics") or ""
@@ -239,24 +466,23 @@ def refresh_state():
                           for i, line in enumerate((state.plain_lyrics or "").splitlines())
                           if line.strip()]
 
-            state.lrc_lines = enrich_with_pinyin_and_trans(parsed)
-
-            if ADD_TRANSLATION and all((ln.trans == "" for ln in state.lrc_lines)) \
-               and any(is_cjk(ln.text) for ln in state.lrc_lines):
-                state.last_error = (state.last_error or "") + \
-                    " | Argos zh→en model not installed. See code comment for install snippet."
-
-            sample = state.lrc_lines[0].pinyin if state.lrc_lines else "(none)"
-            print(f"[lyrics] lines={len(state.lrc_lines)}; sample pinyin: {sample}")
+            # show the raw lines now; publish_enrichment() swaps in pinyin/trans
+            # once the background job is done (the page patches them in place)
+            with _enrich_lock:
+                set_lrc_lines(parsed)
+                state._enrich_future = _enrich_pool.submit(enrich_with_pinyin_and_trans, parsed)
         else:
+            with _enrich_lock:
+                state._enrich_future = None
             state.plain_lyrics = ""
-            state.lrc_lines = []
+            set_lrc_lines([])
             print("[lyrics] not found")
 
 def poller():
     while True:
         try:
             refresh_state()
+            publish_enrichment()
         except Exception as e:
             state.last_error = f"poller error: {e}"
         time.sleep(POLL_SEC)
@@ -264,10 +490,9 @@ def poller():
 threading.Thread(target=poller, daemon=True).start()
 
 # ───────── web api ─────────
-@app.route("/api/state")
-def api_state():
-    refresh_state()  # ensure fresh on first render
-    payload = {
+def state_json() -> str:
+    """Full state as JSON; only the small dynamic part is serialized per call."""
+    dynamic = json.dumps({
         "track_id": state.track_id,
         "title": state.title,
         "artists": state.artists,
@@ -275,10 +500,55 @@ def api_state():
         "progress_ms": state.progress_ms,
         "is_playing": state.is_playing,
         "plain_lyrics": state.plain_lyrics,
-        "lrc": [{"t": ln.t, "text": ln.text, "pinyin": ln.pinyin, "trans": ln.trans} for ln in (state.lrc_lines or [])],
         "error": state.last_error,
-    }
-    return jsonify(payload)
+    })
+    return f'{{"lrc": {state._lrc_json}, {dynamic[1:]}'
+
+@app.route("/api/state")
+def api_state():
+    # the poller keeps state fresh; only hit Spotify inline before its first pass
+    if state.track_id is None:
+        refresh_state()
+    publish_enrichment()
+    return Response(state_json(), mimetype="application/json")
+
+_stream_slots = threading.BoundedSemaphore(MAX_STREAMS)
+
+@app.route("/api/stream")
+def api_stream():
+    """
+    Server-sent events: the full state (lyrics included) only when the track,
+    lyrics or error change; otherwise a small `tick` with progress and play
+    state every STREAM_TICK_SEC (also the keep-alive that notices closed tabs).
+
+    Limits: a stream loops on a waitress worker thread until its tab closes, so
+    at most MAX_STREAMS (WSGI_THREADS - 2) run at once and the rest get a 503.
+    Browsers also allow only ~6 HTTP/1.1 connections per origin, so many tabs
+    of this page in one browser will stall its other requests before the
+    server cap does.
+    """
+    def events():
+        last_key, last_lines = None, None
+        yield f"retry: {STREAM_RETRY_MS}\n\n"  # EventSource reconnect delay after a drop
+        while True:
+            publish_enrichment()
+            key = (state.track_id, state.title, state.plain_lyrics, state.last_error)
+            if key != last_key or state.lrc_lines is not last_lines:
+                last_key, last_lines = key, state.lrc_lines
+                yield f"data: {state_json()}\n\n"
+            else:
+                tick = {"progress_ms": state.progress_ms, "is_playing": state.is_playing}
+                yield f"event: tick\ndata: {json.dumps(tick)}\n\n"
+            time.sleep(STREAM_TICK_SEC)
+
+    if not _stream_slots.acquire(blocking=False):
+        # at the limit: turn the tab away rather than starve the other routes
+        return Response(f"retry: {STREAM_RETRY_MS}\n\n", status=503, mimetype="text/event-stream",
+                        headers={"Retry-After": str(STREAM_RETRY_MS // 1000)})
+    resp = Response(events(), mimetype="text/event-stream",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+    resp.call_on_close(_stream_slots.release)
+    return resp
 
 @app.route("/")
 def index():
@@ -401,8 +671,10 @@ let lrc = [];
 let startedAt = 0;
 let baseProgress = 0;
 let lastProgress = 0;
+let isPlaying = true;
 let currentIdx = -1;
-let lastLyricsSig = "";
+let prevIdx = -1;      // row that currently carries .active
+let renderedLrc = [];  // lines currently in the DOM, diffed against on update
 
 function setSong(title, artists){
   document.getElementById('song').textContent = title || "no track";
@@ -411,32 +683,52 @@ function setSong(title, artists){
 function setErr(msg){
   document.getElementById('err').textContent = msg || "";
 }
-function lyricsSignature(arr){
-  if (!arr || !arr.length) return "0";
-  return arr.length + "|" + arr[0].text + "|" + arr[arr.length-1].text;
+function sameLines(a, b){
+  if (a.length !== b.length) return false;
+  for (let i = 0; i < a.length; i++) {
+    if (a[i].text !== b[i].text) return false;
+  }
+  return true;
 }
 
+// text_html/pinyin/trans arrive HTML-escaped from the server; text is raw (diffing only)
 function renderLyrics(){
   const box = document.getElementById('lyrics');
   if(!lrc.length){
     box.innerHTML = '<div class="fallback">no synced lyrics found. if plain lyrics exist, they will show below.</div>';
+    renderedLrc = [];
+    return;
+  }
+  if (sameLines(lrc, renderedLrc)) {
+    // same lines, only pinyin/trans may differ: patch those nodes, keep layout + highlight
+    for (let i = 0; i < lrc.length; i++) {
+      const ln = lrc[i], old = renderedLrc[i];
+      if (ln.pinyin === old.pinyin && ln.trans === old.trans) continue;
+      const el = document.getElementById('r' + i);
+      el.querySelector('.pinyin').innerHTML = ln.pinyin || "";
+      el.querySelector('.trans').innerHTML = ln.trans ?? "";
+    }
+    renderedLrc = lrc;
     return;
   }
   box.innerHTML = lrc.map((ln, i) => `
     <div class="row" id="r${i}">
-      <div class="hanzi">${ln.text}</div>
+      <div class="hanzi">${ln.text_html}</div>
       <div class="right-side">
         <div class="pinyin">${ln.pinyin || ""}</div>
         <div class="trans">${ln.trans ?? ""}</div>
       </div>
     </div>
   `).join("");
+  renderedLrc = lrc;
   currentIdx = -1;
+  prevIdx = -1;
 }
 
 function highlightLoop(){
   const now = Date.now();
-  const elapsed = Math.max(0, now - startedAt);
+  // paused: hold at the last reported position instead of extrapolating
+  const elapsed = isPlaying ? Math.max(0, now - startedAt) : 0;
   const posSec = (baseProgress + elapsed) / 1000.0;
 
   let lo = 0, hi = lrc.length - 1, cand = -1;
@@ -458,55 +750,70 @@ function highlightLoop(){
     currentIdx = cand;
   }
 
-  for (let i = 0; i < lrc.length; i++) {
-    const el = document.getElementById('r' + i);
-    if (!el) continue;
-    if (i === currentIdx) {
+  // touch the DOM only on a line change; scrollIntoView every frame keeps retargeting the scroll
+  if (currentIdx !== prevIdx) {
+    document.getElementById('r' + prevIdx)?.classList.remove('active');
+    const el = document.getElementById('r' + currentIdx);
+    if (el) {
       el.classList.add('active');
       el.scrollIntoView({ behavior: 'smooth', block: 'center' });
-    } else {
-      el.classList.remove('active');
     }
+    prevIdx = currentIdx;
   }
   requestAnimationFrame(highlightLoop);
 }
 
-async function fetchState(){
-  try{
-    const r = await fetch('/api/state');
-    const j = await r.json();
-    setSong(j.title, j.artists);
-    setErr(j.error || "");
-
-    if (typeof j.progress_ms === "number") {
-      if (j.progress_ms >= lastProgress) {
-        baseProgress = j.progress_ms;
-        startedAt = Date.now();
-      }
-      lastProgress = j.progress_ms;
+function applyProgress(j){
+  const playing = j.is_playing !== false;
+  if (typeof j.progress_ms === "number") {
+    // ticks repeat the same progress between server polls; only re-anchor
+    // when it moved forward or play/pause flipped, so the clock keeps running
+    const moved = j.progress_ms !== lastProgress && j.progress_ms >= lastProgress;
+    if (moved || playing !== isPlaying) {
+      baseProgress = j.progress_ms;
+      startedAt = Date.now();
     }
+    lastProgress = j.progress_ms;
+  }
+  isPlaying = playing;
+}
 
-    if (j.lrc && Array.isArray(j.lrc) && j.lrc.length) {
-      const sig = lyricsSignature(j.lrc);
-      if (sig !== lastLyricsSig) {
-        lrc = j.lrc;
-        lastLyricsSig = sig;
-        renderLyrics();
-      }
-    } else if (j.plain_lyrics) {
-      const box = document.getElementById('lyrics');
-      box.innerHTML = '<pre class="fallback">'+
-        j.plain_lyrics.replace(/[<>]/g, s=>({'<':'&lt;','>':'&gt;'}[s]))+
-        '</pre>';
-      lrc = [];
-      lastLyricsSig = "0";
-      currentIdx = -1;
-    }
-  } catch(e){
-    setErr("frontend error: " + e);
+function applyState(j){
+  setSong(j.title, j.artists);
+  setErr(j.error || "");
+  applyProgress(j);
+
+  if (j.lrc && Array.isArray(j.lrc) && j.lrc.length) {
+    lrc = j.lrc;
+    renderLyrics();
+  } else if (j.plain_lyrics) {
+    const box = document.getElementById('lyrics');
+    box.innerHTML = '<pre class="fallback">'+
+      j.plain_lyrics.replace(/[<>]/g, s=>({'<':'&lt;','>':'&gt;'}[s]))+
+      '</pre>';
+    lrc = [];
+    renderedLrc = [];
+    currentIdx = -1;
+    prevIdx = -1;
   }
 }
 
+function connectStream(){
+  // full state arrives as a default message, progress updates as `tick`;
+  // EventSource reconnects on its own and the server resends full state
+  const es = new EventSource('/api/stream');
+  es.onmessage = e => {
+    try { applyState(JSON.parse(e.data)); }
+    catch(err){ setErr("frontend error: " + err); }
+  };
+  es.addEventListener('tick', e => applyProgress(JSON.parse(e.data)));
+  es.onerror = () => {
+    setErr("stream disconnected, reconnecting…");
+    // a 503 (server at its stream limit) closes EventSource for good; retry ourselves
+    if (es.readyState === EventSource.CLOSED) setTimeout(connectStream, 5000);
+  };
+}
+
 // disable all manual scroll inputs but allow auto-scroll
 document.addEventListener('wheel', e => e.preventDefault(), { passive: false });
 document.addEventListener('touchmove', e => e.preventDefault(), { passive: false });
@@ -515,8 +822,9 @@ document.addEventListener('keydown', e => {
   if (blocked.includes(e.key)) e.preventDefault();
 });
 
-setInterval(fetchState, 2000);
-fetchState().then(()=>{ renderLyrics(); highlightLoop(); });
+renderLyrics();
+connectStream();
+highlightLoop();
 </script>
 </body>
 </html>
@@ -527,5 +835,14 @@ fetchState().then(()=>{ renderLyrics(); highlightLoop(); });
 # ───────── main ─────────
 if __name__ == "__main__":
     ensure_sp()
+    if ADD_TRANSLATION and get_argos_zh_en() is not None:
+        # load the translator + CTranslate2 model now so the first track has no cold start;
+        # a failure here just means batch_translate will fall back to per-line translate
+        try:
+            _ct2_backend(get_argos_zh_en())
+        except Exception as e:
+            print(f"[argos] preload failed: {e}")
     print("[start] open http://127.0.0.1:5000 in your browser")
-    app.run(host="127.0.0.1", port=5000, debug=False)
+    # every open /api/stream holds one of these threads; api_stream caps streams at
+    # MAX_STREAMS so / and /api/state always have a thread left
+    serve(app, host="127.0.0.1", port=5000, threads=WSGI_THREADS)